@@ -1,5 +1,6 @@
 from flask import Flask, redirect, url_for
 from config import config
+from extensions import cache
 from auth import auth_bp
 from main import main_bp
 import os
@@ -7,11 +8,17 @@ import os
 def create_app(config_name=None):
     """Application factory pattern"""
     app = Flask(__name__)
-    
+
     # Load configuration
     config_name = config_name or os.environ.get('FLASK_ENV', 'default')
     app.config.from_object(config[config_name])
-    
+
+    # Initialize extensions
+    cache.init_app(app)
+    if app.config.get('SESSION_TYPE'):
+        from flask_session import Session
+        Session(app)
+
     # Register blueprints
     app.register_blueprint(auth_bp, url_prefix='/auth')
     app.register_blueprint(main_bp)
@@ -6,10 +6,11 @@ auth_bp = Blueprint('auth', __name__)
 db = Database()
 user_model = User(db)
 
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', re.ASCII)
+
 def is_valid_email(email):
     """Validate email format"""
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+    return _EMAIL_RE.match(email) is not None
 
 def is_valid_password(password):
     """Validate password strength"""
@@ -61,8 +62,8 @@ def signup():
             errors.append('Passwords do not match')
         
         if errors:
-            for error in errors:
-                flash(error, 'error')
+            # One flash (one session write) instead of one per error
+            flash(' • '.join(errors), 'error')
             return render_template('auth/signup.html')
         
         # Create user
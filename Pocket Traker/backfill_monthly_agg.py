@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+One-off backfill of the monthly_agg summary table from existing transactions.
+Run this once after upgrading a database that predates monthly_agg.
+"""
+
+from models import Database
+
+def backfill():
+    """Rebuild monthly_agg from the transactions table"""
+    print("Backfilling monthly aggregates...")
+
+    try:
+        db = Database()
+        with db.get_connection(write=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute('BEGIN')
+            try:
+                cursor.execute('DELETE FROM monthly_agg')
+                cursor.execute('''
+                    INSERT INTO monthly_agg (user_id, year, month, category_id, type, total)
+                    SELECT
+                        user_id,
+                        CAST(strftime('%Y', transaction_date) AS INTEGER),
+                        CAST(strftime('%m', transaction_date) AS INTEGER),
+                        category_id,
+                        type,
+                        SUM(amount)
+                    FROM transactions
+                    GROUP BY 1, 2, 3, 4, 5
+                ''')
+                cursor.execute('COMMIT')
+            except Exception:
+                cursor.execute('ROLLBACK')
+                raise
+
+        print("✅ monthly_agg rebuilt from transactions")
+
+    except Exception as e:
+        print(f"❌ Error backfilling monthly aggregates: {e}")
+        return False
+
+    return True
+
+if __name__ == '__main__':
+    backfill()
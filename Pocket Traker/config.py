@@ -1,11 +1,27 @@
 import os
 from datetime import timedelta
 
+import redis
+
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
     DATABASE_URL = os.environ.get('DATABASE_URL') or 'sqlite:///pocket_tracker.db'
     PERMANENT_SESSION_LIFETIME = timedelta(days=7)
-    
+    BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', '12'))
+
+    # Caching (Redis when REDIS_URL is set, in-process cache otherwise)
+    REDIS_URL = os.environ.get('REDIS_URL')
+    CACHE_TYPE = 'RedisCache' if REDIS_URL else 'SimpleCache'
+    CACHE_REDIS_URL = REDIS_URL
+    CACHE_DEFAULT_TIMEOUT = 600
+
+    # Server-side sessions (cookie carries only the session ID); falls
+    # back to Flask's signed-cookie sessions when Redis isn't available
+    SESSION_TYPE = 'redis' if REDIS_URL else None
+    SESSION_REDIS = redis.from_url(REDIS_URL) if REDIS_URL else None
+    SESSION_USE_SIGNER = True
+    SESSION_PERMANENT = True
+
     # Security settings
     WTF_CSRF_ENABLED = True
     SESSION_COOKIE_SECURE = os.environ.get('FLASK_ENV') == 'production'
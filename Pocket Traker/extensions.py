@@ -0,0 +1,4 @@
+from flask_caching import Cache
+
+# Shared cache instance, initialized in create_app()
+cache = Cache()
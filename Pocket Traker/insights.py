@@ -1,7 +1,28 @@
-from datetime import datetime, timedelta
+from datetime import datetime, date, timedelta
 from typing import List, Dict
 import calendar
 
+from models import _month_bounds
+
+# Static tip content, built once at import instead of per call
+_SPENDING_TIPS_BASE = (
+    "💡 Track every expense, no matter how small",
+    "🎯 Set realistic budgets for each category",
+    "📱 Review your expenses weekly",
+    "🛒 Make a shopping list before going out",
+    "☕ Consider making coffee at home instead of buying",
+    "🚗 Use public transport or carpool to save on travel",
+    "🍽️ Cook meals at home more often",
+    "💳 Use cash for discretionary spending to stay mindful"
+)
+
+# Personalized tip per top-category keyword (keys pre-lowered)
+_KEYWORD_TIPS = {
+    'food': "🍽️ Plan your meals weekly to reduce food expenses",
+    'travel': "🚗 Consider carpooling or public transport for daily commute",
+    'shopping': "🛒 Wait 24 hours before making non-essential purchases"
+}
+
 class InsightsEngine:
     def __init__(self, db):
         self.db = db
@@ -17,11 +38,41 @@ class InsightsEngine:
         
         prev_month = current_month - 1 if current_month > 1 else 12
         prev_year = current_year if current_month > 1 else current_year - 1
-        
-        # Get monthly summaries
-        current_summary = self._get_monthly_summary(user_id, current_year, current_month)
-        prev_summary = self._get_monthly_summary(user_id, prev_year, prev_month)
-        
+
+        # One connection checkout covers all the sub-analyses
+        with self.db.get_connection() as conn:
+            # Users with no transactions at all (fresh signups) have
+            # nothing to analyze; skip the aggregates entirely
+            if conn.execute('SELECT 1 FROM transactions WHERE user_id = ? LIMIT 1',
+                            (user_id,)).fetchone() is None:
+                return []
+
+            # One query covering both months; summaries and per-category
+            # expense dicts are derived locally from the breakdown
+            breakdown = self._get_two_month_category_breakdown(
+                conn, user_id, prev_year, prev_month, current_year, current_month
+            )
+            budget_alerts = self._check_budget_alerts(conn, user_id, current_year, current_month)
+            savings_insights = self._analyze_savings_pattern(conn, user_id)
+
+        current_key = f"{current_year:04d}-{current_month:02d}"
+        prev_key = f"{prev_year:04d}-{prev_month:02d}"
+
+        current_summary = {'income': 0, 'expense': 0}
+        prev_summary = {'income': 0, 'expense': 0}
+        current_expenses = {}
+        prev_expenses = {}
+
+        for (month_key, trans_type, category), total in breakdown.items():
+            if month_key == current_key:
+                current_summary[trans_type] += total
+                if trans_type == 'expense':
+                    current_expenses[category] = total
+            elif month_key == prev_key:
+                prev_summary[trans_type] += total
+                if trans_type == 'expense':
+                    prev_expenses[category] = total
+
         # Spending trend analysis
         if prev_summary['expense'] > 0:
             expense_change = ((current_summary['expense'] - prev_summary['expense']) / prev_summary['expense']) * 100
@@ -32,87 +83,43 @@ class InsightsEngine:
                 insights.append(f"✅ Great job! You reduced expenses by {abs(expense_change):.1f}% this month.")
         
         # Category-wise insights
-        category_insights = self._analyze_category_spending(user_id, current_year, current_month)
+        category_insights = self._analyze_category_spending(current_expenses, prev_expenses)
         insights.extend(category_insights)
         
         # Budget alerts
-        budget_alerts = self._check_budget_alerts(user_id, current_year, current_month)
         insights.extend(budget_alerts)
-        
+
         # Savings insights
-        savings_insights = self._analyze_savings_pattern(user_id)
         insights.extend(savings_insights)
         
         return insights[:5]  # Return top 5 insights
     
-    def _get_monthly_summary(self, user_id: int, year: int, month: int) -> Dict:
-        """Get monthly summary for analysis"""
-        conn = self.db.get_connection()
+    def _get_two_month_category_breakdown(self, conn, user_id: int, prev_year: int, prev_month: int,
+                                          year: int, month: int) -> Dict:
+        """Get per-category income/expense totals for two consecutive months in one query"""
         cursor = conn.cursor()
-        
         cursor.execute('''
-            SELECT 
-                type,
-                SUM(amount) as total
-            FROM transactions 
-            WHERE user_id = ? 
-            AND strftime('%Y', transaction_date) = ? 
-            AND strftime('%m', transaction_date) = ?
-            GROUP BY type
-        ''', (user_id, str(year), f"{month:02d}"))
-        
-        results = cursor.fetchall()
-        conn.close()
-        
-        summary = {'income': 0, 'expense': 0}
-        for row in results:
-            summary[row['type']] = float(row['total'])
-        
-        return summary
-    
-    def _analyze_category_spending(self, user_id: int, year: int, month: int) -> List[str]:
+            SELECT
+                a.year,
+                a.month,
+                a.type,
+                c.name,
+                a.total
+            FROM monthly_agg a
+            LEFT JOIN categories c ON c.id = a.category_id
+            WHERE a.user_id = ?
+            AND (a.year, a.month) IN (VALUES (?, ?), (?, ?))
+        ''', (user_id, prev_year, prev_month, year, month))
+
+        # Stream the cursor with positional unpacking; no Row-by-name
+        # lookups or intermediate fetchall list
+        return {(f"{y:04d}-{m:02d}", trans_type, name): float(total)
+                for y, m, trans_type, name, total in cursor}
+
+    def _analyze_category_spending(self, current_expenses: Dict, prev_expenses: Dict) -> List[str]:
         """Analyze category-wise spending patterns"""
         insights = []
-        
-        # Get current month category expenses
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT 
-                c.name,
-                SUM(t.amount) as current_total
-            FROM transactions t
-            JOIN categories c ON t.category_id = c.id
-            WHERE t.user_id = ? 
-            AND t.type = 'expense'
-            AND strftime('%Y', t.transaction_date) = ? 
-            AND strftime('%m', t.transaction_date) = ?
-            GROUP BY c.id, c.name
-        ''', (user_id, str(year), f"{month:02d}"))
-        
-        current_expenses = {row['name']: float(row['current_total']) for row in cursor.fetchall()}
-        
-        # Get previous month for comparison
-        prev_month = month - 1 if month > 1 else 12
-        prev_year = year if month > 1 else year - 1
-        
-        cursor.execute('''
-            SELECT 
-                c.name,
-                SUM(t.amount) as prev_total
-            FROM transactions t
-            JOIN categories c ON t.category_id = c.id
-            WHERE t.user_id = ? 
-            AND t.type = 'expense'
-            AND strftime('%Y', t.transaction_date) = ? 
-            AND strftime('%m', t.transaction_date) = ?
-            GROUP BY c.id, c.name
-        ''', (user_id, str(prev_year), f"{prev_month:02d}"))
-        
-        prev_expenses = {row['name']: float(row['prev_total']) for row in cursor.fetchall()}
-        conn.close()
-        
+
         # Analyze changes
         for category, current_amount in current_expenses.items():
             if category in prev_expenses and prev_expenses[category] > 0:
@@ -136,40 +143,41 @@ class InsightsEngine:
         
         return insights
     
-    def _check_budget_alerts(self, user_id: int, year: int, month: int) -> List[str]:
+    def _check_budget_alerts(self, conn, user_id: int, year: int, month: int) -> List[str]:
         """Check for budget limit violations"""
         alerts = []
-        
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        
+
+        # Most users have no budgets configured; probe before the join
+        if conn.execute('SELECT 1 FROM budgets WHERE user_id = ? LIMIT 1',
+                        (user_id,)).fetchone() is None:
+            return alerts
+
+        start, end = _month_bounds(year, month)
+
         # Get budgets with current spending
+        cursor = conn.cursor()
         cursor.execute('''
-            SELECT 
+            SELECT
                 b.monthly_limit,
                 c.name as category_name,
                 COALESCE(SUM(t.amount), 0) as spent
             FROM budgets b
             JOIN categories c ON b.category_id = c.id
             LEFT JOIN transactions t ON (
-                t.category_id = b.category_id 
-                AND t.user_id = b.user_id 
+                t.category_id = b.category_id
+                AND t.user_id = b.user_id
                 AND t.type = 'expense'
-                AND strftime('%Y', t.transaction_date) = ?
-                AND strftime('%m', t.transaction_date) = ?
+                AND t.transaction_date >= ?
+                AND t.transaction_date < ?
             )
             WHERE b.user_id = ?
             GROUP BY b.id, b.monthly_limit, c.name
-        ''', (str(year), f"{month:02d}", user_id))
-        
-        results = cursor.fetchall()
-        conn.close()
-        
-        for row in results:
-            limit = float(row['monthly_limit'])
-            spent = float(row['spent'])
-            category = row['category_name']
-            
+        ''', (start, end, user_id))
+
+        for monthly_limit, category, spent in cursor:
+            limit = float(monthly_limit)
+            spent = float(spent)
+
             if spent > limit:
                 overspent = spent - limit
                 alerts.append(f"🚨 You exceeded {category} budget by ₹{overspent:.0f}")
@@ -179,35 +187,29 @@ class InsightsEngine:
         
         return alerts
     
-    def _analyze_savings_pattern(self, user_id: int) -> List[str]:
+    def _analyze_savings_pattern(self, conn, user_id: int) -> List[str]:
         """Analyze savings patterns and provide tips"""
         insights = []
-        
+
         # Get last 3 months data
-        conn = self.db.get_connection()
         cursor = conn.cursor()
-        
         cursor.execute('''
-            SELECT 
-                strftime('%Y-%m', transaction_date) as month,
+            SELECT
+                substr(transaction_date, 1, 7) as month,
                 type,
                 SUM(amount) as total
-            FROM transactions 
-            WHERE user_id = ? 
+            FROM transactions
+            WHERE user_id = ?
             AND transaction_date >= date('now', '-3 months')
             GROUP BY month, type
             ORDER BY month DESC
         ''', (user_id,))
-        
-        results = cursor.fetchall()
-        conn.close()
-        
+
         monthly_data = {}
-        for row in results:
-            month = row['month']
+        for month, trans_type, total in cursor:
             if month not in monthly_data:
                 monthly_data[month] = {'income': 0, 'expense': 0}
-            monthly_data[month][row['type']] = float(row['total'])
+            monthly_data[month][trans_type] = float(total)
         
         # Calculate savings rate
         savings_rates = []
@@ -228,42 +230,31 @@ class InsightsEngine:
     
     def get_spending_tips(self, user_id: int) -> List[str]:
         """Generate personalized spending tips"""
-        tips = [
-            "💡 Track every expense, no matter how small",
-            "🎯 Set realistic budgets for each category",
-            "📱 Review your expenses weekly",
-            "🛒 Make a shopping list before going out",
-            "☕ Consider making coffee at home instead of buying",
-            "🚗 Use public transport or carpool to save on travel",
-            "🍽️ Cook meals at home more often",
-            "💳 Use cash for discretionary spending to stay mindful"
-        ]
-        
-        # Get user's top expense category for personalized tip
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT c.name, SUM(t.amount) as total
-            FROM transactions t
-            JOIN categories c ON t.category_id = c.id
-            WHERE t.user_id = ? AND t.type = 'expense'
-            AND t.transaction_date >= date('now', '-1 month')
-            GROUP BY c.id, c.name
-            ORDER BY total DESC
-            LIMIT 1
-        ''', (user_id,))
-        
-        result = cursor.fetchone()
-        conn.close()
-        
+        with self.db.get_connection() as conn:
+            # Cheap index probe: users with no transactions at all (the
+            # common new-signup case) get the static tips without the
+            # aggregate query
+            if conn.execute('SELECT 1 FROM transactions WHERE user_id = ? LIMIT 1',
+                            (user_id,)).fetchone() is None:
+                return list(_SPENDING_TIPS_BASE[:4])
+
+            # Get user's top expense category for personalized tip
+            result = conn.execute('''
+                SELECT c.name, SUM(t.amount) as total
+                FROM transactions t
+                JOIN categories c ON t.category_id = c.id
+                WHERE t.user_id = ? AND t.type = 'expense'
+                AND t.transaction_date >= date('now', '-1 month')
+                GROUP BY c.id, c.name
+                ORDER BY total DESC
+                LIMIT 1
+            ''', (user_id,)).fetchone()
+
+        tips = list(_SPENDING_TIPS_BASE)
         if result:
             category = result['name'].lower()
-            if 'food' in category:
-                tips.insert(0, "🍽️ Plan your meals weekly to reduce food expenses")
-            elif 'travel' in category:
-                tips.insert(0, "🚗 Consider carpooling or public transport for daily commute")
-            elif 'shopping' in category:
-                tips.insert(0, "🛒 Wait 24 hours before making non-essential purchases")
-        
+            keyword_tip = next((tip for keyword, tip in _KEYWORD_TIPS.items() if keyword in category), None)
+            if keyword_tip:
+                tips.insert(0, keyword_tip)
+
         return tips[:4]
\ No newline at end of file
@@ -1,6 +1,8 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify, current_app
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, date
-from models import Database, Transaction, Category, Budget
+from extensions import cache
+from models import Database, Transaction, Category, Budget, _month_bounds
 from insights import InsightsEngine
 from auth import login_required
 
@@ -11,24 +13,66 @@ category_model = Category(db)
 budget_model = Budget(db)
 insights_engine = InsightsEngine(db)
 
+# Workers for fanning out the dashboard's independent reads; WAL mode
+# lets the pooled connections read concurrently
+_dashboard_executor = ThreadPoolExecutor(max_workers=4)
+
+# Memoized read paths; keys include the wrapper arguments, so entries
+# are per user (and per month where applicable)
+@cache.memoize(timeout=600)
+def _cached_insights(user_id):
+    return insights_engine.generate_insights(user_id)
+
+@cache.memoize(timeout=600)
+def _cached_spending_tips(user_id):
+    return insights_engine.get_spending_tips(user_id)
+
+@cache.memoize(timeout=600)
+def _cached_monthly_summary(user_id, year, month):
+    return transaction_model.get_monthly_summary(user_id, year, month)
+
+@cache.memoize(timeout=600)
+def _cached_category_expenses(user_id, year, month):
+    return transaction_model.get_category_expenses(user_id, year, month)
+
+@cache.memoize(timeout=600)
+def _cached_month_dashboard(user_id, year, month):
+    return transaction_model.get_month_dashboard(user_id, year, month)
+
+def _invalidate_user_caches(user_id, year, month):
+    """Drop a user's cached dashboard data after a write touching (year, month)"""
+    cache.delete_memoized(_cached_insights, user_id)
+    cache.delete_memoized(_cached_spending_tips, user_id)
+    cache.delete_memoized(_cached_monthly_summary, user_id, year, month)
+    cache.delete_memoized(_cached_category_expenses, user_id, year, month)
+    cache.delete_memoized(_cached_month_dashboard, user_id, year, month)
+
 @main_bp.route('/')
 @login_required
 def dashboard():
     user_id = session['user_id']
     now = datetime.now()
-    
-    # Get current month summary
-    monthly_summary = transaction_model.get_monthly_summary(user_id, now.year, now.month)
-    
-    # Get recent transactions
-    recent_transactions = transaction_model.get_user_transactions(user_id, limit=10)
-    
-    # Get category expenses for chart
-    category_expenses = transaction_model.get_category_expenses(user_id, now.year, now.month)
-    
-    # Get insights
-    insights = insights_engine.generate_insights(user_id)
-    spending_tips = insights_engine.get_spending_tips(user_id)
+
+    # The dashboard reads are independent, so run them concurrently;
+    # each worker gets an app context so the memoized wrappers can
+    # reach the cache
+    app = current_app._get_current_object()
+
+    def call(fn, *args):
+        with app.app_context():
+            return fn(*args)
+
+    # Summary and category expenses come from one combined query
+    month_future = _dashboard_executor.submit(call, _cached_month_dashboard, user_id, now.year, now.month)
+    transactions_future = _dashboard_executor.submit(call, transaction_model.get_user_transactions, user_id, 10)
+    insights_future = _dashboard_executor.submit(call, _cached_insights, user_id)
+
+    # Tips run on the request thread while the workers are busy
+    spending_tips = _cached_spending_tips(user_id)
+
+    monthly_summary, category_expenses = month_future.result()
+    recent_transactions = transactions_future.result()
+    insights = insights_future.result()
     
     return render_template('main/dashboard.html',
                          summary=monthly_summary,
@@ -65,9 +109,11 @@ def add_transaction():
                 transaction_date = date.today().isoformat()
             
             # Add transaction
-            if transaction_model.add_transaction(user_id, amount, trans_type, 
-                                               category_id, payment_mode, 
+            if transaction_model.add_transaction(user_id, amount, trans_type,
+                                               category_id, payment_mode,
                                                description, transaction_date):
+                tx_date = date.fromisoformat(transaction_date)
+                _invalidate_user_caches(user_id, tx_date.year, tx_date.month)
                 flash(f'{trans_type.title()} of ₹{amount:.2f} added successfully!', 'success')
                 return redirect(url_for('main.dashboard'))
             else:
@@ -103,6 +149,8 @@ def budgets():
             if monthly_limit <= 0:
                 flash('Budget limit must be greater than 0', 'error')
             elif budget_model.set_budget(user_id, category_id, monthly_limit):
+                # Budgets feed the insight alerts, so drop that cache entry
+                cache.delete_memoized(_cached_insights, user_id)
                 flash('Budget updated successfully!', 'success')
             else:
                 flash('Error updating budget', 'error')
@@ -118,11 +166,11 @@ def budgets():
     category_spending = transaction_model.get_category_expenses(user_id, now.year, now.month)
     spending_lookup = {cat['name']: cat['total'] for cat in category_spending}
     
-    # Create budget lookup with spending data
+    # Create budget lookup with spending data; get_user_budgets already
+    # joins in category_name, so no per-budget scan of the category list
     budget_lookup = {}
     for budget in user_budgets:
-        category_name = next((cat['name'] for cat in categories if cat['id'] == budget['category_id']), '')
-        budget['current_spending'] = spending_lookup.get(category_name, 0)
+        budget['current_spending'] = spending_lookup.get(budget['category_name'], 0)
         budget_lookup[budget['category_id']] = budget
     
     return render_template('main/budgets.html', 
@@ -139,31 +187,30 @@ def analytics():
     month = request.args.get('month', datetime.now().month, type=int)
     
     # Get monthly summary
-    monthly_summary = transaction_model.get_monthly_summary(user_id, year, month)
-    
+    monthly_summary = _cached_monthly_summary(user_id, year, month)
+
     # Get category expenses
-    category_expenses = transaction_model.get_category_expenses(user_id, year, month)
+    category_expenses = _cached_category_expenses(user_id, year, month)
     
-    # Get last 6 months data for trend chart
+    # Get last 6 months data for trend chart in one range query;
+    # months are derived arithmetically (oldest first) from a flat
+    # year*12+month anchor rather than walking datetimes backwards
+    anchor = year * 12 + month - 1
+    months = [(y, m + 1) for y, m in (divmod(anchor - i, 12) for i in range(5, -1, -1))]
+
+    start = _month_bounds(*months[0])[0]
+    end = _month_bounds(year, month)[1]
+    range_summary = transaction_model.get_range_summary(user_id, start, end)
+
     monthly_trends = []
-    current_date = datetime(year, month, 1)
-    
-    for i in range(6):
-        month_data = transaction_model.get_monthly_summary(user_id, current_date.year, current_date.month)
+    for y, m in months:
+        key = f"{y:04d}-{m:02d}"
         monthly_trends.append({
-            'month': current_date.strftime('%b %Y'),
-            'income': month_data['income'],
-            'expense': month_data['expense']
+            'month': date(y, m, 1).strftime('%b %Y'),
+            'income': range_summary.get((key, 'income'), 0),
+            'expense': range_summary.get((key, 'expense'), 0)
         })
-        
-        # Go to previous month
-        if current_date.month == 1:
-            current_date = current_date.replace(year=current_date.year - 1, month=12)
-        else:
-            current_date = current_date.replace(month=current_date.month - 1)
-    
-    monthly_trends.reverse()
-    
+
     return render_template('main/analytics.html',
                          summary=monthly_summary,
                          category_expenses=category_expenses,
@@ -178,8 +225,8 @@ def category_chart_data():
     year = request.args.get('year', datetime.now().year, type=int)
     month = request.args.get('month', datetime.now().month, type=int)
     
-    category_expenses = transaction_model.get_category_expenses(user_id, year, month)
-    
+    category_expenses = _cached_category_expenses(user_id, year, month)
+
     return jsonify({
         'labels': [cat['name'] for cat in category_expenses],
         'data': [float(cat['total']) for cat in category_expenses],
@@ -192,26 +239,25 @@ def monthly_trend_data():
     """API endpoint for monthly trend chart data"""
     user_id = session['user_id']
     
-    # Get last 6 months data
+    # Get last 6 months data in one range query; same arithmetic month
+    # derivation as analytics()
+    now = datetime.now()
+    anchor = now.year * 12 + now.month - 1
+    months = [(y, m + 1) for y, m in (divmod(anchor - i, 12) for i in range(5, -1, -1))]
+
+    start = _month_bounds(*months[0])[0]
+    end = _month_bounds(now.year, now.month)[1]
+    range_summary = transaction_model.get_range_summary(user_id, start, end)
+
     monthly_data = []
-    current_date = datetime.now()
-    
-    for i in range(6):
-        month_summary = transaction_model.get_monthly_summary(user_id, current_date.year, current_date.month)
+    for y, m in months:
+        key = f"{y:04d}-{m:02d}"
         monthly_data.append({
-            'month': current_date.strftime('%b'),
-            'income': month_summary['income'],
-            'expense': month_summary['expense']
+            'month': date(y, m, 1).strftime('%b'),
+            'income': range_summary.get((key, 'income'), 0),
+            'expense': range_summary.get((key, 'expense'), 0)
         })
-        
-        # Go to previous month
-        if current_date.month == 1:
-            current_date = current_date.replace(year=current_date.year - 1, month=12)
-        else:
-            current_date = current_date.replace(month=current_date.month - 1)
-    
-    monthly_data.reverse()
-    
+
     return jsonify({
         'labels': [data['month'] for data in monthly_data],
         'income': [data['income'] for data in monthly_data],
@@ -1,97 +1,214 @@
+import atexit
+import os
 import sqlite3
+import threading
+import time
 import bcrypt
+import queue
+from contextlib import contextmanager
 from datetime import datetime, date
-from typing import List, Dict, Optional
+from functools import lru_cache
+from typing import Iterable, List, Dict, Optional
+
+# bcrypt cost factor; lower it in prod via env if login RPS is CPU-bound
+_BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', '12'))
+
+_VALID_TYPES = frozenset({'income', 'expense'})
+
+@lru_cache(maxsize=256)
+def _month_bounds(year: int, month: int):
+    """First day of the month and of the next month as ISO date strings
+
+    Cached: almost every request asks for the current month, so the
+    date construction and ISO formatting run once per (year, month).
+    """
+    start = date(year, month, 1).isoformat()
+    end = date(year + (month == 12), month % 12 + 1, 1).isoformat()
+    return start, end
+
+# Schema DDL and seed data, built once at import
+_USERS_DDL = '''
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username VARCHAR(80) UNIQUE NOT NULL,
+        email VARCHAR(120) UNIQUE NOT NULL,
+        password_hash VARCHAR(128) NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        is_active BOOLEAN DEFAULT 1
+    )
+'''
+
+_CATEGORIES_DDL = '''
+    CREATE TABLE IF NOT EXISTS categories (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name VARCHAR(50) NOT NULL,
+        icon VARCHAR(20) DEFAULT '💰',
+        is_default BOOLEAN DEFAULT 0
+    )
+'''
+
+_TRANSACTIONS_DDL = '''
+    CREATE TABLE IF NOT EXISTS transactions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        amount DECIMAL(10,2) NOT NULL,
+        type VARCHAR(10) NOT NULL CHECK (type IN ('income', 'expense')),
+        category_id INTEGER NOT NULL,
+        payment_mode VARCHAR(20) NOT NULL,
+        description TEXT,
+        transaction_date DATE NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users (id),
+        FOREIGN KEY (category_id) REFERENCES categories (id)
+    )
+'''
+
+_BUDGETS_DDL = '''
+    CREATE TABLE IF NOT EXISTS budgets (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        category_id INTEGER NOT NULL,
+        monthly_limit DECIMAL(10,2) NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users (id),
+        FOREIGN KEY (category_id) REFERENCES categories (id),
+        UNIQUE(user_id, category_id)
+    )
+'''
+
+# Materialized monthly totals, maintained transactionally by
+# Transaction.add_transaction; dashboard reads become index seeks on
+# (user_id, year, month) instead of scans over transactions. Backfill
+# existing data with backfill_monthly_agg.py.
+_MONTHLY_AGG_DDL = '''
+    CREATE TABLE IF NOT EXISTS monthly_agg (
+        user_id INTEGER NOT NULL,
+        year INTEGER NOT NULL,
+        month INTEGER NOT NULL,
+        category_id INTEGER NOT NULL,
+        type VARCHAR(10) NOT NULL,
+        total DECIMAL(10,2) NOT NULL,
+        PRIMARY KEY (user_id, year, month, category_id, type)
+    ) WITHOUT ROWID
+'''
+
+# Indexes for the monthly range scans and category joins
+_INDEX_DDLS = (
+    '''
+    CREATE INDEX IF NOT EXISTS ix_tx_user_date_type
+    ON transactions(user_id, transaction_date, type)
+    ''',
+    '''
+    CREATE INDEX IF NOT EXISTS ix_tx_category
+    ON transactions(category_id, user_id)
+    ''',
+    # Matches get_user_transactions' ORDER BY so the planner streams the
+    # newest rows straight off the index instead of sorting per request
+    '''
+    CREATE INDEX IF NOT EXISTS ix_tx_user_date_created
+    ON transactions(user_id, transaction_date DESC, created_at DESC)
+    ''',
+)
+
+_DEFAULT_CATEGORIES = (
+    ('Food', '🍽️', 1),
+    ('Travel', '🚗', 1),
+    ('Rent', '🏠', 1),
+    ('Shopping', '🛒', 1),
+    ('Entertainment', '🎬', 1),
+    ('Healthcare', '🏥', 1),
+    ('Education', '📚', 1),
+    ('Other', '📦', 1),
+    ('Salary', '💼', 1),
+    ('Freelance', '💻', 1)
+)
 
 class Database:
+    POOL_SIZE = 5
+
+    # Paths whose schema has already been initialized this process; the
+    # schema is static, so re-running init_db on every Database()
+    # (auth.py and main.py each build one at import) is wasted work
+    _initialized_paths = set()
+
     def __init__(self, db_path: str = 'pocket_tracker.db'):
         self.db_path = db_path
-        self.init_db()
-    
-    def get_connection(self):
-        conn = sqlite3.connect(self.db_path)
+
+        # One writer, many readers: WAL lets the read-only pool run
+        # concurrently with the single serialized write connection.
+        # The writer opens first so the database file and schema exist
+        # before the read-only handles attach.
+        self._write_conn = self._create_connection()
+        self._write_lock = threading.Lock()
+        if db_path not in Database._initialized_paths:
+            self.init_db()
+            Database._initialized_paths.add(db_path)
+
+        self._pool = queue.Queue(maxsize=self.POOL_SIZE)
+        for _ in range(self.POOL_SIZE):
+            self._pool.put(self._create_connection(readonly=True))
+        atexit.register(self.close)
+
+    def _create_connection(self, readonly: bool = False):
+        """Open a tuned connection (read-only for the reader pool)"""
+        if readonly:
+            conn = sqlite3.connect(f'file:{self.db_path}?mode=ro', uri=True,
+                                   check_same_thread=False, isolation_level=None,
+                                   cached_statements=256)
+        else:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None,
+                                   cached_statements=256)
+            # Journal settings need write access; readers inherit WAL
+            # from the file itself
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
         conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA cache_size=-64000')
+        conn.execute('PRAGMA mmap_size=134217728')
         return conn
-    
+
+    def close(self):
+        """Close all connections (registered for process shutdown)"""
+        while True:
+            try:
+                conn = self._pool.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+        self._write_conn.close()
+
+    @contextmanager
+    def get_connection(self, write: bool = False):
+        """Check out a connection; writers serialize on the single RW handle"""
+        if write:
+            with self._write_lock:
+                yield self._write_conn
+            return
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
     def init_db(self):
-        """Initialize database with tables"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Users table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username VARCHAR(80) UNIQUE NOT NULL,
-                email VARCHAR(120) UNIQUE NOT NULL,
-                password_hash VARCHAR(128) NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                is_active BOOLEAN DEFAULT 1
-            )
-        ''')
-        
-        # Categories table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS categories (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name VARCHAR(50) NOT NULL,
-                icon VARCHAR(20) DEFAULT '💰',
-                is_default BOOLEAN DEFAULT 0
-            )
-        ''')
-        
-        # Transactions table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS transactions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                amount DECIMAL(10,2) NOT NULL,
-                type VARCHAR(10) NOT NULL CHECK (type IN ('income', 'expense')),
-                category_id INTEGER NOT NULL,
-                payment_mode VARCHAR(20) NOT NULL,
-                description TEXT,
-                transaction_date DATE NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users (id),
-                FOREIGN KEY (category_id) REFERENCES categories (id)
-            )
-        ''')
-        
-        # Budgets table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS budgets (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                category_id INTEGER NOT NULL,
-                monthly_limit DECIMAL(10,2) NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users (id),
-                FOREIGN KEY (category_id) REFERENCES categories (id),
-                UNIQUE(user_id, category_id)
-            )
-        ''')
-        
-        # Insert default categories
-        default_categories = [
-            ('Food', '🍽️', 1),
-            ('Travel', '🚗', 1),
-            ('Rent', '🏠', 1),
-            ('Shopping', '🛒', 1),
-            ('Entertainment', '🎬', 1),
-            ('Healthcare', '🏥', 1),
-            ('Education', '📚', 1),
-            ('Other', '📦', 1),
-            ('Salary', '💼', 1),
-            ('Freelance', '💻', 1)
-        ]
-        
-        cursor.executemany(
-            'INSERT OR IGNORE INTO categories (name, icon, is_default) VALUES (?, ?, ?)',
-            default_categories
-        )
-        
-        conn.commit()
-        conn.close()
+        """Initialize database with tables (one transaction, one fsync)"""
+        with self.get_connection(write=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+            try:
+                for ddl in (_USERS_DDL, _CATEGORIES_DDL, _TRANSACTIONS_DDL,
+                            _BUDGETS_DDL, _MONTHLY_AGG_DDL, *_INDEX_DDLS):
+                    cursor.execute(ddl)
+                cursor.executemany(
+                    'INSERT OR IGNORE INTO categories (name, icon, is_default) VALUES (?, ?, ?)',
+                    _DEFAULT_CATEGORIES
+                )
+                cursor.execute('COMMIT')
+            except Exception:
+                cursor.execute('ROLLBACK')
+                raise
+            cursor.execute('ANALYZE')
 
 class User:
     def __init__(self, db: Database):
@@ -100,143 +217,301 @@ class User:
     def create_user(self, username: str, email: str, password: str) -> bool:
         """Create new user with hashed password"""
         try:
-            password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-            
-            conn = self.db.get_connection()
-            cursor = conn.cursor()
-            cursor.execute(
-                'INSERT INTO users (username, email, password_hash) VALUES (?, ?, ?)',
-                (username, email, password_hash)
-            )
-            conn.commit()
-            conn.close()
+            password_hash = bcrypt.hashpw(password.encode('utf-8'),
+                                          bcrypt.gensalt(rounds=_BCRYPT_ROUNDS)).decode('utf-8')
+
+            with self.db.get_connection(write=True) as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    'INSERT INTO users (username, email, password_hash) VALUES (?, ?, ?)',
+                    (username, email, password_hash)
+                )
             return True
         except sqlite3.IntegrityError:
             return False
     
     def authenticate(self, username: str, password: str) -> Optional[Dict]:
         """Authenticate user and return user data"""
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            'SELECT * FROM users WHERE username = ? AND is_active = 1',
-            (username,)
-        )
-        user = cursor.fetchone()
-        conn.close()
-        
+        # Fetch the row and return the connection to the pool before the
+        # bcrypt check; the ~100ms hash must not hold a pooled connection
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                'SELECT id, username, email, password_hash FROM users WHERE username = ? AND is_active = 1',
+                (username,)
+            )
+            row = cursor.fetchone()
+
+        user = dict(row) if row else None
         if user and bcrypt.checkpw(password.encode('utf-8'), user['password_hash'].encode('utf-8')):
-            return dict(user)
+            return user
         return None
     
     def get_by_id(self, user_id: int) -> Optional[Dict]:
         """Get user by ID"""
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM users WHERE id = ?', (user_id,))
-        user = cursor.fetchone()
-        conn.close()
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM users WHERE id = ?', (user_id,))
+            user = cursor.fetchone()
         return dict(user) if user else None
 
 class Transaction:
+    # Hot-path SQL kept as class attributes so Python's per-connection
+    # statement cache (keyed on the string) reliably hits the same
+    # compiled statement instead of re-generating VDBE bytecode
+    _SQL_INSERT_TX = '''
+        INSERT INTO transactions
+        (user_id, amount, type, category_id, payment_mode, description, transaction_date)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    '''
+
+    _SQL_UPSERT_AGG = '''
+        INSERT INTO monthly_agg (user_id, year, month, category_id, type, total)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(user_id, year, month, category_id, type)
+        DO UPDATE SET total = total + excluded.total
+    '''
+
+    # Category name/icon are attached from the cached lookup in Python;
+    # joining categories here would cost an index probe per row.
+    # Columns are enumerated rather than t.*: user_id is the caller's
+    # own argument, and every listed column is either rendered by the
+    # templates or (created_at) part of the keyset cursor.
+    _SQL_LIST_TX = '''
+        SELECT t.id, t.amount, t.type, t.category_id, t.payment_mode,
+               t.description, t.transaction_date, t.created_at
+        FROM transactions t
+        WHERE t.user_id = ?
+        ORDER BY t.transaction_date DESC, t.created_at DESC
+        LIMIT ?
+    '''
+
+    # Keyset ("seek") variant: resumes strictly after a known
+    # (transaction_date, created_at) position via a row-value
+    # comparison, an index seek that stays O(limit) at any page depth,
+    # unlike OFFSET which scans past every skipped row
+    _SQL_LIST_TX_AFTER = '''
+        SELECT t.id, t.amount, t.type, t.category_id, t.payment_mode,
+               t.description, t.transaction_date, t.created_at
+        FROM transactions t
+        WHERE t.user_id = ?
+        AND (t.transaction_date, t.created_at) < (?, ?)
+        ORDER BY t.transaction_date DESC, t.created_at DESC
+        LIMIT ?
+    '''
+
     def __init__(self, db: Database):
         self.db = db
-    
-    def add_transaction(self, user_id: int, amount: float, trans_type: str, 
-                       category_id: int, payment_mode: str, description: str, 
+        self._categories = Category(db)
+
+    def add_transaction(self, user_id: int, amount: float, trans_type: str,
+                       category_id: int, payment_mode: str, description: str,
                        transaction_date: str) -> bool:
         """Add new transaction"""
+        return self.add_transactions([
+            (user_id, amount, trans_type, category_id, payment_mode, description, transaction_date)
+        ])
+
+    def add_transactions(self, rows: Iterable[tuple]) -> bool:
+        """Insert a batch of transactions under one commit
+
+        Each row is (user_id, amount, type, category_id, payment_mode,
+        description, transaction_date). The single transaction amortizes
+        SQLite's commit fsync across the batch, which is the difference
+        between per-row and bulk import speed on write-heavy paths.
+
+        Accepts any iterable — a CSV-import generator streams straight
+        into executemany without being buffered into a list. Bad input
+        raises ValueError (which the views already handle); real
+        database errors bubble instead of hiding behind a broad except.
+        """
+        # monthly_agg deltas per bucket, filled in as executemany
+        # drains the generator below
+        agg = {}
+
+        def validated(rows):
+            for row in rows:
+                user_id, amount, trans_type, category_id, _, _, transaction_date = row
+                if trans_type not in _VALID_TYPES:
+                    raise ValueError(f"invalid transaction type: {trans_type!r}")
+                if amount <= 0:
+                    raise ValueError("amount must be greater than 0")
+                key = (user_id, int(transaction_date[:4]), int(transaction_date[5:7]),
+                       category_id, trans_type)
+                agg[key] = agg.get(key, 0) + amount
+                yield row
+
         try:
-            conn = self.db.get_connection()
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO transactions 
-                (user_id, amount, type, category_id, payment_mode, description, transaction_date)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (user_id, amount, trans_type, category_id, payment_mode, description, transaction_date))
-            conn.commit()
-            conn.close()
+            with self.db.get_connection(write=True) as conn:
+                cursor = conn.cursor()
+                # Check foreign keys once at COMMIT rather than per
+                # row; resets itself when the transaction ends. A
+                # no-op unless PRAGMA foreign_keys is turned on, but
+                # keeps large imports cheap if it ever is.
+                cursor.execute('PRAGMA defer_foreign_keys = ON')
+                cursor.execute('BEGIN')
+                try:
+                    cursor.executemany(self._SQL_INSERT_TX, validated(rows))
+                    cursor.executemany(self._SQL_UPSERT_AGG,
+                                       (key + (total,) for key, total in agg.items()))
+                    cursor.execute('COMMIT')
+                except Exception:
+                    cursor.execute('ROLLBACK')
+                    raise
             return True
-        except Exception:
+        except sqlite3.IntegrityError:
             return False
     
-    def get_user_transactions(self, user_id: int, limit: int = 50) -> List[Dict]:
+    def iter_user_transactions(self, user_id: int, limit: int = 50,
+                               after: Optional[tuple] = None):
+        """Stream user transactions one row at a time
+
+        Yields sqlite3.Row objects straight off the cursor, so large
+        result sets are never materialized twice. The pooled connection
+        is held until the generator is exhausted.
+
+        Pass after=(transaction_date, created_at) of the last row seen
+        to fetch the next page with an index seek instead of OFFSET.
+        """
+        # ~10 static categories: one cached dict lookup per row beats
+        # a JOIN probe per row inside SQLite
+        cats = {c['id']: c for c in self._categories.get_all_categories()}
+
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            if after is None:
+                cursor.execute(self._SQL_LIST_TX, (user_id, limit))
+            else:
+                cursor.execute(self._SQL_LIST_TX_AFTER, (user_id, after[0], after[1], limit))
+            for row in cursor:
+                tx = dict(row)
+                cat = cats.get(tx['category_id'])
+                tx['category_name'] = cat['name'] if cat else None
+                tx['category_icon'] = cat['icon'] if cat else None
+                yield tx
+
+    def get_user_transactions(self, user_id: int, limit: int = 50,
+                              after: Optional[tuple] = None) -> List[Dict]:
         """Get user transactions with category info"""
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT t.*, c.name as category_name, c.icon as category_icon
-            FROM transactions t
-            JOIN categories c ON t.category_id = c.id
-            WHERE t.user_id = ?
-            ORDER BY t.transaction_date DESC, t.created_at DESC
-            LIMIT ?
-        ''', (user_id, limit))
-        transactions = cursor.fetchall()
-        conn.close()
-        return [dict(t) for t in transactions]
+        return list(self.iter_user_transactions(user_id, limit, after))
     
     def get_monthly_summary(self, user_id: int, year: int, month: int) -> Dict:
-        """Get monthly income/expense summary"""
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT 
-                type,
-                SUM(amount) as total
-            FROM transactions 
-            WHERE user_id = ? 
-            AND strftime('%Y', transaction_date) = ? 
-            AND strftime('%m', transaction_date) = ?
-            GROUP BY type
-        ''', (user_id, str(year), f"{month:02d}"))
-        
-        results = cursor.fetchall()
-        conn.close()
-        
+        """Get monthly income/expense summary
+
+        CASE folds income, expense and balance into a single result
+        row, so there is no Python-side loop or branching over types.
+        conn.execute() is used directly — one row back, no cursor
+        object to allocate.
+        """
+        with self.db.get_connection() as conn:
+            income, expense, balance = conn.execute('''
+                SELECT
+                    COALESCE(SUM(CASE WHEN type = 'income' THEN total ELSE 0 END), 0) as income,
+                    COALESCE(SUM(CASE WHEN type = 'expense' THEN total ELSE 0 END), 0) as expense,
+                    COALESCE(SUM(CASE WHEN type = 'income' THEN total ELSE -total END), 0) as balance
+                FROM monthly_agg
+                WHERE user_id = ?
+                AND year = ?
+                AND month = ?
+            ''', (user_id, year, month)).fetchone()
+
+        return {'income': float(income), 'expense': float(expense), 'balance': float(balance)}
+    
+    def get_month_dashboard(self, user_id: int, year: int, month: int):
+        """Get the monthly summary and category expense list in one query
+
+        The dashboard needs both; one scan of the user's monthly_agg
+        rows feeds both results instead of two separate queries.
+        """
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT c.name, c.icon, a.type, a.total
+                FROM monthly_agg a
+                JOIN categories c ON a.category_id = c.id
+                WHERE a.user_id = ?
+                AND a.year = ?
+                AND a.month = ?
+                ORDER BY a.total DESC
+            ''', (user_id, year, month))
+            rows = cursor.fetchall()
+
         summary = {'income': 0, 'expense': 0}
-        for row in results:
-            summary[row['type']] = float(row['total'])
-        
+        category_expenses = []
+        for name, icon, trans_type, total in rows:
+            total = float(total)
+            summary[trans_type] += total
+            if trans_type == 'expense':
+                category_expenses.append({'name': name, 'icon': icon, 'total': total})
+
         summary['balance'] = summary['income'] - summary['expense']
-        return summary
-    
+        return summary, category_expenses
+
+    def get_range_summary(self, user_id: int, start_date: str, end_date: str) -> Dict:
+        """Get per-month income/expense totals over [start_date, end_date)"""
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT
+                    substr(transaction_date, 1, 7) as month,
+                    type,
+                    SUM(amount) as total
+                FROM transactions
+                WHERE user_id = ?
+                AND transaction_date >= ?
+                AND transaction_date < ?
+                GROUP BY month, type
+            ''', (user_id, start_date, end_date))
+            results = cursor.fetchall()
+
+        return {(row['month'], row['type']): float(row['total']) for row in results}
+
     def get_category_expenses(self, user_id: int, year: int, month: int) -> List[Dict]:
         """Get category-wise expenses for charts"""
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT 
-                c.name,
-                c.icon,
-                SUM(t.amount) as total
-            FROM transactions t
-            JOIN categories c ON t.category_id = c.id
-            WHERE t.user_id = ? 
-            AND t.type = 'expense'
-            AND strftime('%Y', t.transaction_date) = ? 
-            AND strftime('%m', t.transaction_date) = ?
-            GROUP BY c.id, c.name, c.icon
-            ORDER BY total DESC
-        ''', (user_id, str(year), f"{month:02d}"))
-        
-        results = cursor.fetchall()
-        conn.close()
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT
+                    c.name,
+                    c.icon,
+                    a.total
+                FROM monthly_agg a
+                JOIN categories c ON a.category_id = c.id
+                WHERE a.user_id = ?
+                AND a.year = ?
+                AND a.month = ?
+                AND a.type = 'expense'
+                ORDER BY a.total DESC
+            ''', (user_id, year, month))
+            results = cursor.fetchall()
+        # Kept as dicts: this result is memoized at the view layer and
+        # sqlite3.Row doesn't pickle
         return [dict(r) for r in results]
 
 class Category:
+    # Refresh interval; bounds staleness when another process (or a
+    # script like init_db.py) changes categories behind our back
+    _CACHE_TTL = 60.0
+
     def __init__(self, db: Database):
         self.db = db
-    
-    def get_all_categories(self) -> List[Dict]:
-        """Get all categories"""
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM categories ORDER BY name')
-        categories = cursor.fetchall()
-        conn.close()
-        return [dict(c) for c in categories]
+        self._cache: Optional[List[sqlite3.Row]] = None
+        self._cache_time = 0.0
+
+    def get_all_categories(self) -> List[sqlite3.Row]:
+        """Get all categories (cached; the table is effectively static)"""
+        now = time.monotonic()
+        if self._cache is None or now - self._cache_time > self._CACHE_TTL:
+            with self.db.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('SELECT * FROM categories ORDER BY name')
+                self._cache = cursor.fetchall()
+            self._cache_time = now
+        return self._cache
+
+    def invalidate(self):
+        """Drop the cached list after a category write"""
+        self._cache = None
 
 class Budget:
     def __init__(self, db: Database):
@@ -244,29 +519,33 @@ class Budget:
     
     def set_budget(self, user_id: int, category_id: int, monthly_limit: float) -> bool:
         """Set or update budget for category"""
-        try:
-            conn = self.db.get_connection()
+        if monthly_limit <= 0:
+            raise ValueError("monthly_limit must be greater than 0")
+        with self.db.get_connection(write=True) as conn:
             cursor = conn.cursor()
+            # UPSERT updates the existing row in place; REPLACE would
+            # delete and re-insert, churning id and indexes, and its
+            # conflict handling was the only reason for the old
+            # blanket try/except
             cursor.execute('''
-                INSERT OR REPLACE INTO budgets (user_id, category_id, monthly_limit)
+                INSERT INTO budgets (user_id, category_id, monthly_limit)
                 VALUES (?, ?, ?)
+                ON CONFLICT(user_id, category_id)
+                DO UPDATE SET monthly_limit = excluded.monthly_limit
             ''', (user_id, category_id, monthly_limit))
-            conn.commit()
-            conn.close()
-            return True
-        except Exception:
-            return False
+        return True
     
     def get_user_budgets(self, user_id: int) -> List[Dict]:
         """Get user budgets with category info"""
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT b.*, c.name as category_name, c.icon as category_icon
-            FROM budgets b
-            JOIN categories c ON b.category_id = c.id
-            WHERE b.user_id = ?
-        ''', (user_id,))
-        budgets = cursor.fetchall()
-        conn.close()
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT b.*, c.name as category_name, c.icon as category_icon
+                FROM budgets b
+                JOIN categories c ON b.category_id = c.id
+                WHERE b.user_id = ?
+            ''', (user_id,))
+            budgets = cursor.fetchall()
+        # Kept as dicts: the budgets view annotates each row with
+        # current_spending, and sqlite3.Row is read-only
         return [dict(b) for b in budgets]
\ No newline at end of file
@@ -69,23 +69,15 @@ def test_transaction_operations(db, user_id):
         
         test_category = categories[0]
         
-        # Add test transactions
-        transactions_added = 0
-        
-        # Add income
-        if transaction_model.add_transaction(
-            user_id, 50000, 'income', test_category['id'], 
-            'Bank Transfer', 'Test salary', '2024-01-01'
-        ):
-            transactions_added += 1
-        
-        # Add expense
-        if transaction_model.add_transaction(
-            user_id, 1500, 'expense', test_category['id'], 
-            'UPI', 'Test expense', '2024-01-02'
-        ):
-            transactions_added += 1
-        
+        # Add test transactions in one batch (one commit fsync)
+        test_transactions = [
+            (user_id, 50000, 'income', test_category['id'],
+             'Bank Transfer', 'Test salary', '2024-01-01'),
+            (user_id, 1500, 'expense', test_category['id'],
+             'UPI', 'Test expense', '2024-01-02')
+        ]
+        transactions_added = len(test_transactions) if transaction_model.add_transactions(test_transactions) else 0
+
         print(f"✅ Added {transactions_added} test transactions")
         
         # Retrieve transactions
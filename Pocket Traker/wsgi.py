@@ -0,0 +1,12 @@
+"""Gunicorn entrypoint for gevent workers.
+
+The monkey-patch must run before anything else imports the standard
+library networking modules, so keep it at the very top.
+"""
+
+from gevent import monkey
+monkey.patch_all()
+
+from app import create_app
+
+app = create_app()